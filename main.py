@@ -1,24 +1,181 @@
 import json
 import argparse
+import mmap
 import os
 import re
+from dataclasses import dataclass, field
 from json.decoder import JSONDecodeError
+from types import MappingProxyType
 
+try:
+    import orjson  # Optional, much faster parsing and writing of whole documents
+except ImportError:
+    orjson = None
 
-def complete_json_structure(incomplete_text, open_char, close_char, missing_count):
+# A JSON string (possibly unterminated at the end of the text), a brace/bracket,
+# or a colon with no value after it. Group 1 holds the closing quote and is
+# empty for an unterminated string.
+_STRUCTURE_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*("?)|[{}\[\]]|:(?=\s*(?:[,}\]]|\Z))')
+
+# Everything up to the next brace outside a string, or up to an unterminated string
+_NON_BRACE_RE = re.compile(r'(?:[^"{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+# Layout written by Chromium: {"constants": {...}, "events": [...], ...}
+_CONSTANTS_HEADER_RE = re.compile(r'\s*\{\s*"constants"\s*:\s*')
+_EVENTS_HEADER_RE = re.compile(r'\s*,\s*"events"\s*:\s*\[')
+
+# A comma directly followed by a closing bracket/brace
+_TRAILING_COMMA_RE = re.compile(r',(\s*[\]}])')
+
+# The rest of a JSON string after its opening quote, up to the closing quote
+_STRING_TAIL_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+
+# Closing character for each opening one
+_CLOSERS = {'{': '}', '[': ']'}
+
+# Top-level sections located by _index_file
+_INDEXED_SECTIONS = ('constants', 'events')
+
+# Compiled '"<key>": {' / '"<key>": [' patterns, by key
+_SECTION_KEY_RES = {}
+
+# Whitespace and commas separating array items
+_SEPARATORS_RE = re.compile(r'[ \t\n\r,]*')
+
+# Required NetLog event fields, filled in on recovered events that lack them
+_EVENT_DEFAULTS = MappingProxyType({
+    "time": "0",
+    "type": 0,
+    "phase": 0,
+    "source": {"id": 0, "type": 0, "start_time": "0"},
+})
+
+# A run of digits too long for a 64-bit integer, which orjson cannot hold exactly
+_LONG_NUMBER_RE = re.compile(r'[0-9]{19}')
+
+# Size of each read when streaming the input file
+_READ_CHUNK_SIZE = 1 << 20
+
+# Buffer size for writing the output file
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _scan_structure(text):
+    """
+    Scan text once, skipping over string contents (including escaped quotes).
+    Returns (open_stack, in_string_at_end, missing_values) where open_stack holds
+    the '{' and '[' still open at the end, outermost first, and missing_values
+    are the offsets right after colons that have no value.
+    """
+    open_stack = []
+    in_string = False
+    missing_values = []
+
+    for match in _STRUCTURE_TOKEN_RE.finditer(text):
+        token = match.group()
+        if token == '{' or token == '[':
+            open_stack.append(token)
+        elif token == '}' or token == ']':
+            if open_stack:
+                open_stack.pop()
+        elif token == ':':
+            missing_values.append(match.end())
+        elif not match.group(1):
+            # Unterminated string, it runs to the end of the text
+            in_string = True
+
+    return open_stack, in_string, missing_values
+
+
+def _fill_missing_values(text, positions):
+    """
+    Insert null at each of the given offsets, in a single join.
+    """
+    pieces = []
+    prev = 0
+    for pos in positions:
+        pieces.append(text[prev:pos])
+        pieces.append('null')
+        prev = pos
+    pieces.append(text[prev:])
+    return ''.join(pieces)
+
+
+@dataclass
+class FileIndex:
+    """
+    Structural summary of a whole NetLog file, built in a single pass.
+    `sections` maps top-level keys ('constants', 'events') to the (start, end)
+    offsets of their value; end is None when the value is never closed.
+    """
+    sections: dict = field(default_factory=dict)
+    open_braces: int = 0
+    close_braces: int = 0
+    open_brackets: int = 0
+    close_brackets: int = 0
+    in_string_at_end: bool = False
+
+
+def _index_file(text):
+    """
+    Scan the whole file once, counting braces/brackets outside strings and
+    locating the top-level 'constants' and 'events' values.
+    """
+    index = FileIndex()
+    stack = []
+    key = None
+    open_section = None
+
+    for match in _STRUCTURE_TOKEN_RE.finditer(text):
+        token = match.group()
+        if token[0] == '"':
+            if not match.group(1):
+                index.in_string_at_end = True
+            # A top-level key, if its value turns out to be an object or array
+            key = token[1:-1] if len(stack) == 1 and token[1:-1] in _INDEXED_SECTIONS else None
+            continue
+
+        if token == ':':
+            continue
+
+        if token == '{' or token == '[':
+            if token == '{':
+                index.open_braces += 1
+            else:
+                index.open_brackets += 1
+            if key and key not in index.sections:
+                index.sections[key] = (match.start(), None)
+                open_section = key
+            stack.append(token)
+        else:
+            if token == '}':
+                index.close_braces += 1
+            else:
+                index.close_brackets += 1
+            if len(stack) == 2 and open_section:
+                index.sections[open_section] = (index.sections[open_section][0], match.end())
+                open_section = None
+            if stack:
+                stack.pop()
+        key = None
+
+    return index
+
+
+def complete_json_structure(incomplete_text, open_char, close_char, missing_count, in_string=None):
     """
     Complete an incomplete JSON structure by adding missing closing brackets/braces
     and handling incomplete strings and objects.
+    Pass in_string when a previous scan already knows if the text ends inside a string.
     """
     text = incomplete_text.rstrip()
     
     # If the text ends with an incomplete string, try to close it
-    if text.count('"') % 2 == 1:  # Odd number of quotes means unterminated string
-        # Find the last quote and check if it's escaped
-        last_quote_pos = text.rfind('"')
-        if last_quote_pos > 0 and text[last_quote_pos - 1] != '\\':
-            text += '"'
-            print("⚠️  Completed unterminated string")
+    if in_string is None:
+        _, in_string, _ = _scan_structure(text)
+    if in_string:
+        text += '"'
+        print("⚠️  Completed unterminated string")
     
     # If the text ends with a comma and incomplete structure, try to remove trailing comma
     text = text.rstrip(' \t\n\r,')
@@ -29,26 +186,32 @@ def complete_json_structure(incomplete_text, open_char, close_char, missing_coun
     return text
 
 
-def complete_incomplete_event(event_text):
+def complete_incomplete_event(event_text, missing_braces=None):
     """
     Try to complete an incomplete JSON event by filling in missing fields and brackets.
+    missing_braces can be passed when the caller already knows the brace balance,
+    e.g. from split_on_event_boundaries; balanced events are then rejected without a scan.
     """
+    if missing_braces is not None and missing_braces <= 0:
+        return None
+
     event_text = event_text.strip().rstrip(',').strip()
     
-    # Count unmatched braces
-    open_braces = event_text.count('{')
-    close_braces = event_text.count('}')
-    missing_braces = open_braces - close_braces
+    # Find the braces and brackets left open
+    open_stack, in_string, missing_values = _scan_structure(event_text)
     
-    # If the event text is not empty and has unmatched braces
-    if event_text and missing_braces > 0:
+    # If the event text is not empty and has unmatched braces or brackets
+    if event_text and open_stack:
         # Check if we have an unterminated string
-        quote_count = event_text.count('"')
-        if quote_count % 2 == 1:  # Unterminated string
+        if in_string:
             event_text += '"'
+
+        # Give keys cut off before their value a null value
+        if missing_values:
+            event_text = _fill_missing_values(event_text, missing_values)
         
-        # Add missing closing braces
-        event_text += '}' * missing_braces
+        # Close whatever is still open, innermost first
+        event_text += ''.join(_CLOSERS[char] for char in reversed(open_stack))
         
         try:
             # Try to parse the completed event
@@ -57,78 +220,114 @@ def complete_incomplete_event(event_text):
             # Validate that it has the basic structure of a netlog event
             if isinstance(event, dict):
                 # Add missing required fields if they don't exist
-                if 'time' not in event:
-                    event['time'] = "0"
-                if 'type' not in event:
-                    event['type'] = 0
-                if 'phase' not in event:
-                    event['phase'] = 0
-                if 'source' not in event:
-                    event['source'] = {"id": 0, "type": 0, "start_time": "0"}
-                    
-                return event
+                return {**_EVENT_DEFAULTS, **event}
         except json.JSONDecodeError:
             pass
     
     return None
 
 
-def extract_json_section(text, key):
+def _find(text, char, pos):
+    """
+    str.find that returns len(text) instead of -1 when char is not found.
+    """
+    found = text.find(char, pos)
+    return len(text) if found == -1 else found
+
+
+def extract_json_section(text, key, index=None):
     """
     Extract the JSON object or array associated with a given key.
     Example: extract 'events': [ ... ]
+    A FileIndex of the text, if given, replaces the scan for the sections it located.
     """
-    match = re.search(rf'"{key}"\s*:\s*([\[\{{])', text)
+    if index is not None and key in index.sections:
+        start, end = index.sections[key]
+        if end is not None:
+            return text[start:end], (start, end)
+
+        # The section runs to the end of the file, close only the section itself;
+        # a truncated last event inside it is completed along with its fields later
+        start_char = text[start]
+        close_char = _CLOSERS[start_char]
+        completed_section = complete_json_structure(text[start:], start_char, close_char, 1, index.in_string_at_end)
+        print(f"⚠️  Warning: Incomplete {key} section detected - added 1 missing '{close_char}'")
+        return completed_section, (start, start + len(completed_section))
+
+    key_re = _SECTION_KEY_RES.get(key)
+    if key_re is None:
+        key_re = _SECTION_KEY_RES[key] = re.compile(rf'"{re.escape(key)}"\s*:\s*([\[\{{])')
+
+    match = key_re.search(text)
     if not match:
         return None, None
 
     start_char = match.group(1)
     close_char = '}' if start_char == '{' else ']'
     start = match.end(1) - 1
-    end = start
     open_count = 1
+    in_string = False
 
-    while end < len(text) - 1:
-        end += 1
-        char = text[end]
-        if char == start_char:
+    # Jump between the next opening char, closing char and quote with str.find
+    # instead of stepping through every character; len(text) stands for "none left"
+    size = len(text)
+    next_open = _find(text, start_char, start + 1)
+    next_close = _find(text, close_char, start + 1)
+    next_quote = _find(text, '"', start + 1)
+
+    while True:
+        end = min(next_open, next_close, next_quote)
+        if end == size:
+            break
+
+        if end == next_quote:
+            # Skip the whole string, braces inside it do not count
+            string_end = _STRING_TAIL_RE.match(text, end + 1)
+            if not string_end:
+                in_string = True
+                break
+            end = string_end.end() - 1
+            if next_open < end:
+                next_open = _find(text, start_char, end + 1)
+            if next_close < end:
+                next_close = _find(text, close_char, end + 1)
+            next_quote = _find(text, '"', end + 1)
+        elif end == next_open:
             open_count += 1
-        elif char == close_char:
+            next_open = _find(text, start_char, end + 1)
+        else:
             open_count -= 1
             if open_count == 0:
                 return text[start:end + 1], (match.start(), end + 1)
+            next_close = _find(text, close_char, end + 1)
 
     # If we reach here, the section is incomplete
     # Complete it by adding missing closing brackets/braces
-    incomplete_section = text[start:end + 1]
-    completed_section = complete_json_structure(incomplete_section, start_char, close_char, open_count)
+    incomplete_section = text[start:]
+    completed_section = complete_json_structure(incomplete_section, start_char, close_char, open_count, in_string)
     print(f"⚠️  Warning: Incomplete {key} section detected - added {open_count} missing '{close_char}'")
     return completed_section, (match.start(), len(completed_section))
 
 
-def parse_events_array_aggressive(events_text):
+def parse_events_array_aggressive(events_text, in_string=None):
     """
     Aggressively parse and complete the events array, trying to salvage as much as possible.
+    Pass in_string when the caller already knows if the text ends inside a string.
     """
     events = []
     
-    # Clean up the events text
-    if events_text.startswith('['):
-        events_text = events_text[1:]
-    if events_text.endswith(']'):
-        events_text = events_text[:-1]
-    
     # First, try to fix obvious issues like unterminated strings
-    events_text = fix_common_json_issues(events_text)
+    events_text = fix_common_json_issues(events_text, in_string)
     
-    # Split on complete event boundaries (},) but preserve incomplete events
-    potential_events = split_on_event_boundaries(events_text)
+    # Split on complete event boundaries (},) but preserve incomplete events.
+    # The enclosing '[' is skipped by the splitter, so the text is not trimmed, but
+    # the closing ']' is left out so it cannot end up in a truncated last event.
+    array_end = events_text.rfind(']')
+    spans = split_on_event_boundaries(events_text, array_end if array_end != -1 else None)
     
-    for i, event_text in enumerate(potential_events):
-        event_text = event_text.strip()
-        if not event_text:
-            continue
-            
+    for i, (start, end, missing_braces) in enumerate(spans):
+        event_text = events_text[start:end]
+
         # Try to parse the event as-is first
         try:
             event = json.loads(event_text)
@@ -138,7 +337,7 @@ def parse_events_array_aggressive(events_text):
             pass
         
         # Try to complete the incomplete event
-        completed_event = complete_incomplete_event(event_text)
+        completed_event = complete_incomplete_event(event_text, missing_braces)
         if completed_event:
             events.append(completed_event)
             print(f"⚠️  Completed and recovered event {i+1}")
@@ -148,161 +347,393 @@ def parse_events_array_aggressive(events_text):
     return events
 
 
-def fix_common_json_issues(text):
+def fix_common_json_issues(text, in_string=None):
     """
     Fix common JSON issues like unterminated strings, trailing commas, etc.
+    Pass in_string when a previous scan already knows if the text ends inside a string.
     """
     # Handle unterminated strings at the end
-    quote_count = text.count('"')
-    if quote_count % 2 == 1:
-        # Find the last quote
-        last_quote = text.rfind('"')
-        if last_quote > 0:
-            # Check if it's escaped
-            if last_quote > 0 and text[last_quote - 1] != '\\':
-                text += '"'
-                print("⚠️  Fixed unterminated string")
+    if in_string is None:
+        _, in_string, _ = _scan_structure(text)
+    if in_string:
+        text += '"'
+        print("⚠️  Fixed unterminated string")
     
     # Remove trailing commas before closing brackets/braces
-    text = re.sub(r',(\s*[\]}])', r'\1', text)
+    text = _TRAILING_COMMA_RE.sub(r'\1', text)
     
     return text
 
 
-def split_on_event_boundaries(text):
+def split_on_event_boundaries(text, endpos=None):
     """
-    Split text on event boundaries, keeping incomplete events.
+    Split text (up to endpos, if given) on event boundaries, keeping incomplete events.
+    Returns (start, end, missing_braces) for each event in text, missing_braces
+    being 0 for every event but an incomplete last one.
     """
-    events = []
-    current_event = ""
+    spans = []
     brace_depth = 0
-    in_string = False
-    escape_next = False
-    
-    for char in text:
-        if escape_next:
-            escape_next = False
-            current_event += char
-            continue
-            
-        if char == '\\' and in_string:
-            escape_next = True
-            current_event += char
-            continue
-            
-        if char == '"' and not escape_next:
-            in_string = not in_string
-            
-        current_event += char
-        
-        if not in_string:
-            if char == '{':
-                brace_depth += 1
-            elif char == '}':
+    start = 0
+    pos = 0
+    size = len(text) if endpos is None else endpos
+
+    while True:
+        # Jump over everything but braces, whole strings included, in one regex call
+        pos = _NON_BRACE_RE.match(text, pos, size).end()
+        if pos == size:
+            break
+
+        char = text[pos]
+        if char == '{':
+            if brace_depth == 0:
+                start = pos
+            brace_depth += 1
+        elif char == '}':
+            if brace_depth > 0:
                 brace_depth -= 1
-                
+
                 # Complete event found
                 if brace_depth == 0:
-                    events.append(current_event.rstrip(',').strip())
-                    current_event = ""
-    
+                    spans.append((start, pos + 1, 0))
+        else:
+            # An unterminated string, it runs to the end of the text
+            break
+        pos += 1
+
     # Add any remaining incomplete event
-    if current_event.strip():
-        events.append(current_event.strip())
-    
-    return events
+    if brace_depth > 0:
+        spans.append((start, size, brace_depth))
 
+    return spans
 
-def fix_netlog(input_path, output_path):
-    with open(input_path, 'r') as f:
-        raw = f.read()
 
-    # Try to complete the entire JSON file first
-    completed_json = complete_entire_json_file(raw)
-    
-    # Try to parse the completed JSON
-    try:
-        netlog_data = json.loads(completed_json)
-        print("✅ Successfully parsed completed JSON")
-        
-        # Ensure we have the basic structure
-        if 'constants' not in netlog_data:
-            netlog_data['constants'] = {}
-        if 'events' not in netlog_data:
-            netlog_data['events'] = []
-            
-    except json.JSONDecodeError:
-        print("⚠️  Fallback to section-by-section recovery")
-        # Fallback to the original approach
-        constants_str, _ = extract_json_section(raw, "constants")
-        events_str, _ = extract_json_section(raw, "events")
+def _is_truncated(err, text):
+    """
+    Tell whether a decode error was caused by the text running out
+    rather than by malformed content.
+    """
+    return err.msg.startswith('Unterminated string') or not text[err.pos:].strip()
+
+
+def _refill(f, buf, idx):
+    """
+    Drop the consumed part of the buffer and append the next chunk of the file.
+    """
+    chunk = f.read(_READ_CHUNK_SIZE)
+    return buf[idx:] + chunk, 0, bool(chunk)
+
+
+def stream_netlog(f):
+    """
+    Decode the 'constants' of a NetLog from an open file and set up incremental
+    decoding of its events. Returns (constants, events, extra) where events is
+    an iterator and extra receives the sections after the events array once it
+    is exhausted, or None when the file does not start with 'constants'
+    followed by 'events'.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(_READ_CHUNK_SIZE)
+
+    header = _CONSTANTS_HEADER_RE.match(buf)
+    if not header:
+        return None
+
+    idx = header.end()
+    last_error = None
+    while True:
+        try:
+            constants, idx = decoder.raw_decode(buf, idx)
+            break
+        except json.JSONDecodeError as err:
+            # A chunk may also end inside a literal or number, so only give up
+            # on the same error coming back at the same place after reading more
+            error = (err.msg, err.pos - idx)
+            truncated = _is_truncated(err, buf)
+            if not truncated and error == last_error:
+                return None
+            buf, idx, more = _refill(f, buf, idx)
+            if not more:
+                return None
+            last_error = None if truncated else error
+
+    buf, idx, _ = _refill(f, buf, idx)
+    header = _EVENTS_HEADER_RE.match(buf, idx)
+    if not header:
+        return None
+
+    extra = {}
+    return constants, iter_events(f, decoder, buf, header.end(), extra), extra
+
+
+def iter_events(f, decoder, buf, idx, extra):
+    """
+    Yield events one at a time, starting at idx in buf just inside the events
+    array and reading more of f as needed. Only a truncated final event goes
+    through completion; a malformed event before the end of the file raises
+    JSONDecodeError. Sections after the events array are stored in extra.
+    """
+    count = 0
+    last_error = None
+    while True:
+        # Skip whitespace and commas between events
+        idx = _SEPARATORS_RE.match(buf, idx).end()
+
+        if idx == len(buf):
+            buf, idx, more = _refill(f, buf, idx)
+            if not more:
+                print("⚠️  Warning: Incomplete events section detected")
+                return
+            continue
+
+        if buf[idx] == ']':
+            break
 
-        if not constants_str or not events_str:
-            print("❌ Could not locate 'constants' or 'events' in the file.")
+        try:
+            event, idx = decoder.raw_decode(buf, idx)
+        except json.JSONDecodeError as err:
+            # A chunk may also end inside a literal or number, so only treat the event
+            # as malformed when the same error comes back at the same place after reading more
+            error = (err.msg, err.pos - idx)
+            truncated = _is_truncated(err, buf)
+            if not truncated and error == last_error:
+                raise
+            buf, idx, more = _refill(f, buf, idx)
+            if more:
+                last_error = None if truncated else error
+                continue
+            if not truncated:
+                raise
+
+            # Out of data, so only the final event is broken
+            print("⚠️  Warning: Incomplete events section detected")
+            completed_event = complete_incomplete_event(buf)
+            if completed_event:
+                print(f"⚠️  Completed and recovered event {count + 1}")
+                yield completed_event
             return
 
+        last_error = None
+        count += 1
+        yield event
+
+    # Keep any other top-level sections following the events (e.g. 'polledData')
+    rest = (buf[idx + 1:] + f.read()).strip()
+    if rest.startswith(','):
         try:
-            constants = json.loads(constants_str)
+            extra.update(json.loads('{' + rest[1:]))
         except json.JSONDecodeError:
-            print("⚠️ 'constants' block is malformed. Using empty dict.")
-            constants = {}
+            print("⚠️  Dropped malformed data after 'events'")
+
+
+def _read_mapped(path):
+    """
+    Read a whole file through a memory map, decoding the text straight from
+    the mapped pages instead of reading it into an intermediate bytes copy.
+    """
+    with open(path, 'rb') as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, 'utf-8')
 
-        events = parse_events_array_aggressive(events_str)
-        
-        netlog_data = {
-            "constants": constants,
-            "events": events
-        }
 
-    with open(output_path, 'w') as f:
-        json.dump(netlog_data, f, indent=2)
+def _loads(text):
+    """
+    Parse a whole JSON document, with orjson when it is installed and the
+    document has no integers it would turn into floats.
+    """
+    if orjson and not _LONG_NUMBER_RE.search(text):
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def recover_netlog(raw):
+    """
+    Recover a NetLog from the whole file content: parse it as is, then try
+    completing the entire JSON, then fall back to section-by-section recovery.
+    """
+    try:
+        # The content may well be valid already, so skip all the scanning
+        netlog_data = _loads(raw)
+        print("✅ Successfully parsed JSON")
+    except json.JSONDecodeError:
+        # Index the file once for completion and section extraction
+        index = _index_file(raw)
+
+        # Try to complete the entire JSON file
+        completed_json = complete_entire_json_file(raw, index)
+        try:
+            netlog_data = _loads(completed_json)
+            print("✅ Successfully parsed completed JSON")
+        except json.JSONDecodeError:
+            print("⚠️  Fallback to section-by-section recovery")
+            constants_str, _ = extract_json_section(raw, "constants", index)
+            events_str, _ = extract_json_section(raw, "events", index)
+
+            if not constants_str or not events_str:
+                print("❌ Could not locate 'constants' or 'events' in the file.")
+                return None
+
+            try:
+                constants = json.loads(constants_str)
+            except json.JSONDecodeError:
+                print("⚠️ 'constants' block is malformed. Using empty dict.")
+                constants = {}
+
+            # extract_json_section closed any unterminated string, so skip the scan
+            events = parse_events_array_aggressive(events_str, in_string=False)
+
+            return {
+                "constants": constants,
+                "events": events
+            }
+
+    # Ensure we have the basic structure
+    if 'constants' not in netlog_data:
+        netlog_data['constants'] = {}
+    if 'events' not in netlog_data:
+        netlog_data['events'] = []
+
+    return netlog_data
+
+
+def _dumps(value, pretty, level=0):
+    """
+    Serialize a value to bytes. When pretty, it is indented as if nested
+    `level` deep in the document, matching json.dump(..., indent=2).
+    """
+    # Compact output unless asked otherwise, indenting is much slower with the json module
+    data = None
+    if orjson:
+        try:
+            data = orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except orjson.JSONEncodeError:
+            # e.g. an integer wider than 64 bits, which the json module handles
+            pass
+
+    if data is None:
+        if pretty:
+            data = json.dumps(value, indent=2).encode()
+        else:
+            data = json.dumps(value, separators=(',', ':')).encode()
+
+    if pretty and level:
+        data = data.replace(b'\n', b'\n' + b'  ' * level)
+    return data
+
+
+def write_netlog(out, constants, events, extra, pretty=False):
+    """
+    Write a NetLog to a binary file, serializing events one at a time as they
+    come from the events iterator so they never have to be held in memory
+    together. extra holds any other top-level sections, written after the
+    events (it is read only once the events are exhausted). Returns the number
+    of events written.
+    """
+    newline = b'\n' if pretty else b''
+    indent = b'  ' if pretty else b''
+    colon = b': ' if pretty else b':'
+
+    out.write(b'{' + newline + indent + b'"constants"' + colon + _dumps(constants, pretty, 1))
+    out.write(b',' + newline + indent + b'"events"' + colon + b'[')
+
+    count = 0
+    for event in events:
+        out.write((b',' if count else b'') + newline + indent * 2 + _dumps(event, pretty, 2))
+        count += 1
+    out.write((newline + indent if count else b'') + b']')
+
+    for key, value in extra.items():
+        if key not in ('constants', 'events'):
+            out.write(b',' + newline + indent + _dumps(key, False) + colon + _dumps(value, pretty, 1))
+    out.write(newline + b'}')
+
+    return count
+
+
+def fix_netlog(input_path, output_path, pretty=False):
+    # Write to a separate file and move it into place at the end, so the input
+    # (which may be the output path too) is never truncated while being read
+    partial_path = output_path + '.partial'
+    event_count = None
+
+    try:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            stream = stream_netlog(f)
+            if stream is not None:
+                constants, events, extra = stream
+                try:
+                    with open(partial_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as out:
+                        event_count = write_netlog(out, constants, events, extra, pretty)
+                    print("✅ Successfully parsed events incrementally")
+                except json.JSONDecodeError:
+                    # A malformed event in the middle, recover from the whole file instead
+                    event_count = None
+
+        if event_count is None:
+            print("⚠️  Fallback to whole-file recovery")
+            netlog_data = recover_netlog(_read_mapped(input_path))
+            if netlog_data is None:
+                return
+
+            constants = netlog_data.pop('constants')
+            events = netlog_data.pop('events')
+            with open(partial_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as out:
+                event_count = write_netlog(out, constants, events, netlog_data, pretty)
+
+        os.replace(partial_path, output_path)
+    finally:
+        # Never leave a half-written output behind, whatever stopped the run
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
 
-    event_count = len(netlog_data.get('events', []))
     print(f"✅ Fixed NetLog saved to: {output_path}")
     print(f"✔️  Recovered {event_count} event(s).")
 
 
-def complete_entire_json_file(raw_content):
+def complete_entire_json_file(raw_content, index=None):
     """
     Try to complete the entire JSON file by adding missing brackets, braces, and fields.
+    Takes the FileIndex of raw_content if one was already built.
     """
     content = raw_content.strip()
     
     # Check if content starts with opening brace
-    if not content.startswith('{'):
-        content = '{' + content
+    prefix = '' if content.startswith('{') else '{'
     
-    # Count unmatched braces and brackets
-    open_braces = content.count('{')
-    close_braces = content.count('}')
-    open_brackets = content.count('[')
-    close_brackets = content.count(']')
+    # Count unmatched braces and brackets, ignoring any inside strings
+    if index is None:
+        index = _index_file(content)
+    brace_delta = index.open_braces - index.close_braces
+    bracket_delta = index.open_brackets - index.close_brackets
+    in_string = index.in_string_at_end
     
+    # Closing characters are collected and joined once at the end
+    suffix = []
+
     # Handle unterminated strings
-    quote_count = content.count('"')
-    if quote_count % 2 == 1:
-        # Find the last unescaped quote
-        last_quote_pos = content.rfind('"')
-        if last_quote_pos > 0 and content[last_quote_pos - 1] != '\\':
-            content += '"'
-            print("⚠️  Completed unterminated string in file")
+    if in_string:
+        suffix.append('"')
+        print("⚠️  Completed unterminated string in file")
     
     # Remove trailing commas before adding closing brackets
-    content = re.sub(r',(\s*)$', r'\1', content)
+    if not suffix and content.endswith(','):
+        content = content[:-1]
     
     # Add missing closing brackets for arrays
-    missing_brackets = open_brackets - close_brackets
+    missing_brackets = bracket_delta
     if missing_brackets > 0:
-        content += ']' * missing_brackets
+        suffix.append(']' * missing_brackets)
         print(f"⚠️  Added {missing_brackets} missing closing bracket(s)")
     
     # Add missing closing braces for objects
-    missing_braces = open_braces - close_braces
+    missing_braces = brace_delta + len(prefix)
     if missing_braces > 0:
-        content += '}' * missing_braces
+        suffix.append('}' * missing_braces)
         print(f"⚠️  Added {missing_braces} missing closing brace(s)")
     
-    return content
+    return ''.join([prefix, content, *suffix])
 
 
 def main():
@@ -317,6 +748,11 @@ def main():
         "-o", "--output",
         help="Optional output file name (.json)"
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the output JSON (slower and larger)"
+    )
     args = parser.parse_args()
 
     input_file = args.filename
@@ -327,7 +763,7 @@ def main():
     base_name = os.path.splitext(input_file)[0]
     output_file = args.output or (base_name + ".json")
 
-    fix_netlog(input_file, output_file)
+    fix_netlog(input_file, output_file, args.pretty)
 
 
 if __name__ == "__main__":